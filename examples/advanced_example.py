@@ -9,173 +9,237 @@
 
 import msgbus
 import time
-import random
-import threading
+import array
+from time import perf_counter_ns
+import numpy as np
 from collections import defaultdict
-from statistics import mean, stdev
+
+try:
+    from numba import njit
+except ImportError:  # numba 是可选依赖 (pip install .[jit]), 缺失时退回 numpy 实现
+    njit = None
+
+
+def _summarize_numpy(latencies):
+    """返回 (mean, stdev, min, max), 每项各做一次 numpy 归约"""
+    stdev = latencies.std(ddof=1) if latencies.size > 1 else 0.0
+    return latencies.mean(), stdev, latencies.min(), latencies.max()
+
+
+def _summarize_fused(latencies):
+    """返回 (mean, stdev, min, max), 单次遍历 (Welford) 完成, 供 numba 编译"""
+    n = latencies.size
+    avg = 0.0
+    m2 = 0.0
+    lo = latencies[0]
+    hi = latencies[0]
+    for i in range(n):
+        v = latencies[i]
+        delta = v - avg
+        avg += delta / (i + 1)
+        m2 += delta * (v - avg)
+        if v < lo:
+            lo = v
+        elif v > hi:
+            hi = v
+    stdev = np.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+    return avg, stdev, lo, hi
+
+
+summarize_latencies = njit(cache=True)(_summarize_fused) if njit else _summarize_numpy
 
 
 class LatencyTracker:
-    """延迟跟踪器"""
-    def __init__(self, name):
+    """延迟跟踪器
+
+    每个跟踪器只被一个订阅者回调线程写入, 写入路径无需加锁;
+    print_stats 须在订阅者停止 (hub.stop_all) 之后调用
+    """
+    def __init__(self, name, capacity):
         self.name = name
-        self.latencies = []
-        self.lock = threading.Lock()
+        # 预分配 int64 缓冲区, 避免每条消息 append 一个 Python int
+        self.latencies = np.empty(capacity, dtype=np.int64)
+        self.count = 0
 
     def add(self, latency_ns):
-        with self.lock:
-            self.latencies.append(latency_ns)
+        i = self.count
+        self.latencies[i] = latency_ns
+        self.count = i + 1
 
     def print_stats(self):
-        with self.lock:
-            if not self.latencies:
-                print(f"{self.name}: No data")
-                return
-
-            latencies_us = [lat / 1000 for lat in self.latencies]  # 转换为微秒
-            print(f"\n{self.name} Statistics:")
-            print(f"  Count: {len(latencies_us)}")
-            print(f"  Mean: {mean(latencies_us):.2f} μs")
-            if len(latencies_us) > 1:
-                print(f"  StdDev: {stdev(latencies_us):.2f} μs")
-            print(f"  Min: {min(latencies_us):.2f} μs")
-            print(f"  Max: {max(latencies_us):.2f} μs")
-
-            # 百分位数
-            sorted_lat = sorted(latencies_us)
-            n = len(sorted_lat)
-            print(f"  P50: {sorted_lat[n * 50 // 100]:.2f} μs")
-            print(f"  P90: {sorted_lat[n * 90 // 100]:.2f} μs")
-            print(f"  P99: {sorted_lat[n * 99 // 100]:.2f} μs")
+        if not self.count:
+            print(f"{self.name}: No data")
+            return
+
+        # 统计量直接在纳秒 int64 缓冲区上计算, 输出时再转换为微秒
+        latencies = self.latencies[:self.count]
+        n = latencies.size
+        avg, stdev, lo, hi = summarize_latencies(latencies)
+        print(f"\n{self.name} Statistics:")
+        print(f"  Count: {n}")
+        print(f"  Mean: {avg / 1000:.2f} μs")
+        if n > 1:
+            print(f"  StdDev: {stdev / 1000:.2f} μs")
+        print(f"  Min: {lo / 1000:.2f} μs")
+        print(f"  Max: {hi / 1000:.2f} μs")
+
+        # 百分位数: 一次 np.partition 同时定位三个分位点, O(N) 无需完整排序
+        ranks = [n * 50 // 100, n * 90 // 100, n * 99 // 100]
+        p50, p90, p99 = np.partition(latencies, ranks)[ranks] / 1000.0
+        print(f"  P50: {p50:.2f} μs")
+        print(f"  P90: {p90:.2f} μs")
+        print(f"  P99: {p99:.2f} μs")
 
 
 class PriceMonitor:
-    """价格监控器"""
+    """价格监控器
+
+    被多个订阅者回调共同写入: 每个回调通过 buffer() 拿到自己独占的缓冲区,
+    写入路径无需加锁; print_summary 在订阅者停止之后一次性合并
+    """
     def __init__(self, name):
         self.name = name
-        self.prices = []
-        self.lock = threading.Lock()
+        self.buffers = []
 
-    def add_price(self, price):
-        with self.lock:
-            self.prices.append(price)
+    def buffer(self):
+        # array('d') 连续存放原始 double, 比 list 省去每个元素的 float 对象
+        prices = array.array('d')
+        self.buffers.append(prices)
+        return prices
 
     def print_summary(self):
-        with self.lock:
-            if not self.prices:
-                return
-            print(f"\n{self.name} Price Summary:")
-            print(f"  Samples: {len(self.prices)}")
-            print(f"  Min: {min(self.prices):.2f}")
-            print(f"  Max: {max(self.prices):.2f}")
-            print(f"  Mean: {mean(self.prices):.2f}")
+        if not self.buffers:
+            return
+        # np.frombuffer 直接引用 array 的内存, 不逐元素拷贝
+        prices = np.concatenate([np.frombuffer(buf, dtype=np.float64) for buf in self.buffers])
+        if not prices.size:
+            return
+        print(f"\n{self.name} Price Summary:")
+        print(f"  Samples: {prices.size}")
+        print(f"  Min: {prices.min():.2f}")
+        print(f"  Max: {prices.max():.2f}")
+        print(f"  Mean: {prices.mean():.2f}")
 
 
 def main():
     hub = msgbus.MarketDataHub()
 
-    # 创建多个跟踪器
-    tracker1 = LatencyTracker("Trade Subscriber 1")
-    tracker2 = LatencyTracker("Trade Subscriber 2")
-    tracker3 = LatencyTracker("Trade Subscriber 3")
-    tracker4 = LatencyTracker("Trade Subscriber 4")
+    base_price = 50000.0
+    num_trades = 1000000
+    num_klines = (num_trades + 9) // 10  # 每 10 笔成交一根 K线
+
+    # 创建多个跟踪器 (每个订阅者最多收到 num_trades 条成交)
+    tracker1 = LatencyTracker("Trade Subscriber 1", num_trades)
+    tracker2 = LatencyTracker("Trade Subscriber 2", num_trades)
+    tracker3 = LatencyTracker("Trade Subscriber 3", num_trades)
+    tracker4 = LatencyTracker("Trade Subscriber 4", num_trades)
     price_monitor = PriceMonitor("Trade Price")
 
     # 订阅者1: 延迟跟踪
     def trade_callback_1(data_type, data):
-        now = time.time_ns()
-        latency = now - data['timestamp']
+        now = perf_counter_ns()
+        latency = now - data.timestamp
         tracker1.add(latency)
 
     # 订阅者2: 延迟跟踪 + 价格监控
+    prices2 = price_monitor.buffer()
     def trade_callback_2(data_type, data):
-        now = time.time_ns()
-        latency = now - data['timestamp']
+        now = perf_counter_ns()
+        latency = now - data.timestamp
         tracker2.add(latency)
-        price_monitor.add_price(data['price'])
-    
+        prices2.append(data.price)
+
+    prices3 = price_monitor.buffer()
     def trade_callback_3(data_type, data):
-        now = time.time_ns()
-        latency = now - data['timestamp']
+        now = perf_counter_ns()
+        latency = now - data.timestamp
         tracker3.add(latency)
-        price_monitor.add_price(data['price'])
+        prices3.append(data.price)
         # 这里可以添加更多的处理逻辑
-    
+
+    prices4 = price_monitor.buffer()
     def trade_callback_4(data_type, data):
-        now = time.time_ns()
-        latency = now - data['timestamp']
+        now = perf_counter_ns()
+        latency = now - data.timestamp
         tracker4.add(latency)
-        price_monitor.add_price(data['price'])
+        prices4.append(data.price)
 
     # 订阅者3: K线数据简单打印
-    kline_count = {'count': 0}
+    kline_count = [0]  # 单元素列表作计数单元, 比 dict 下标访问开销小
     def kline_callback(data_type, data):
-        kline_count['count'] += 1
-        if kline_count['count'] % 100 == 0:
-            print(f"Received {kline_count['count']} klines")
+        n = kline_count[0] + 1
+        kline_count[0] = n
+        if n % 100 == 0:
+            print(f"Received {n} klines")
 
     # 创建订阅
     print("Creating subscriptions...")
-    sub1 = hub.subscribe(msgbus.DataType.TRADE, trade_callback_1)
-    sub2 = hub.subscribe(msgbus.DataType.TRADE, trade_callback_2)
-    sub3 = hub.subscribe(msgbus.DataType.TRADE, trade_callback_3)
-    sub4 = hub.subscribe(msgbus.DataType.TRADE, trade_callback_4)
+    trade_type = msgbus.DataType.TRADE
+    sub1 = hub.subscribe(trade_type, trade_callback_1)
+    sub2 = hub.subscribe(trade_type, trade_callback_2)
+    sub3 = hub.subscribe(trade_type, trade_callback_3)
+    sub4 = hub.subscribe(trade_type, trade_callback_4)
     sub5 = hub.subscribe(msgbus.DataType.KLINE, kline_callback)
 
     print(f"Active subscribers: {hub.subscriber_count()}")
     print("Starting data production...\n")
 
     # 生产数据
-    base_price = 50000.0
-    num_trades = 1000000
-    num_klines = 1000
+    # 预先批量生成随机数, 避免在生产循环里逐条调用 random
+    # tolist() 转为 Python 原生对象, 循环内索引无需再装箱 numpy 标量
+    rng = np.random.default_rng()
+    prices = (base_price + rng.uniform(-100, 100, num_trades)).tolist()
+    quantities = rng.uniform(0.01, 1.0, num_trades).tolist()
+    makers = rng.integers(0, 2, num_trades, dtype=bool).tolist()
+    kline_highs = rng.uniform(0, 50, num_klines).tolist()
+    kline_lows = rng.uniform(0, 50, num_klines).tolist()
+    kline_closes = rng.uniform(-20, 20, num_klines).tolist()
+    kline_volumes = rng.uniform(1, 10, num_klines).tolist()
+
+    # add_kline 按值拷贝, 复用一个 Kline 对象, 不在循环里反复查找并构造 msgbus.Kline
+    kline = msgbus.Kline()
+    kline.symbol = "BTCUSDT"
+
+    # 回调要计算真实延迟, 所以逐条发布: 批量提交会让消息在批次里等待,
+    # 且整批涌入队列会让订阅者排队, 测得的就不再是 hub 的分发延迟了
+    # emit_trade 在 C++ 侧发布前一刻读取单调时钟 (与回调里的 perf_counter_ns 同源)
+    emit_trade = hub.emit_trade
 
     start_time = time.time()
 
     # 生产 Trade 数据
     for i in range(num_trades):
-        trade = msgbus.Trade()
-        trade.timestamp = time.time_ns()
-        trade.symbol = "BTCUSDT"
-        trade.price = base_price + random.uniform(-100, 100)
-        trade.quantity = random.uniform(0.01, 1.0)
-        trade.is_buyer_maker = random.choice([True, False])
-        hub.add_trade(trade, True)
-
-        # 偶尔添加 K线数据
+        emit_trade("BTCUSDT", prices[i], quantities[i], makers[i], True)
+
+        # 偶尔添加 K线数据 (在其来源成交发布之后)
         if i % 10 == 0:
-            kline = msgbus.Kline()
-            kline.timestamp = time.time_ns()
-            kline.symbol = "BTCUSDT"
-            kline.open = trade.price
-            kline.high = trade.price + random.uniform(0, 50)
-            kline.low = trade.price - random.uniform(0, 50)
-            kline.close = trade.price + random.uniform(-20, 20)
-            kline.volume = random.uniform(1, 10)
+            k = i // 10
+            kline.timestamp = perf_counter_ns()
+            kline.open = prices[i]
+            kline.high = prices[i] + kline_highs[k]
+            kline.low = prices[i] - kline_lows[k]
+            kline.close = prices[i] + kline_closes[k]
+            kline.volume = kline_volumes[k]
             hub.add_kline(kline, True)
 
     elapsed = time.time() - start_time
     print(f"\nProduction completed in {elapsed:.2f} seconds")
     print(f"Throughput: {num_trades / elapsed:.0f} trades/sec")
 
-    # 等待消费完成
+    # 等待消费完成, 然后停止所有订阅者线程
     print("\nWaiting for consumers to process all data...")
     time.sleep(2)
+    hub.stop_all()
+    print(f"Subscribers remaining: {hub.subscriber_count()}")
 
-    # 打印统计信息
+    # 打印统计信息 (订阅者线程均已退出, 读取统计数据无需加锁)
     print("\n" + "=" * 60)
     tracker1.print_stats()
     tracker2.print_stats()
     tracker3.print_stats()
     tracker4.print_stats()
     price_monitor.print_summary()
-    print(f"\nTotal klines received: {kline_count['count']}")
-
-    # 清理
-    print("\n" + "=" * 60)
-    print("Cleaning up...")
-    hub.stop_all()
-    print(f"Subscribers remaining: {hub.subscriber_count()}")
+    print(f"\nTotal klines received: {kline_count[0]}")
 
 
 if __name__ == "__main__":
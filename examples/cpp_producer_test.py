@@ -24,10 +24,11 @@ def test_python_producer(num_messages, num_subscribers):
 
     hub = msgbus.MarketDataHub()
 
-    # 创建订阅者
+    # 创建订阅者 (枚举值在循环外取一次)
+    trade_type = msgbus.DataType.TRADE
     subs = []
     for _ in range(num_subscribers):
-        subs.append(hub.subscribe(msgbus.DataType.TRADE, empty_callback))
+        subs.append(hub.subscribe(trade_type, empty_callback))
 
     # 预创建所有 trade 对象
     trades = []
@@ -72,10 +73,11 @@ def test_cpp_producer(num_messages, num_subscribers):
 
     hub = msgbus.MarketDataHub()
 
-    # 创建订阅者
+    # 创建订阅者 (枚举值在循环外取一次)
+    trade_type = msgbus.DataType.TRADE
     subs = []
     for _ in range(num_subscribers):
-        subs.append(hub.subscribe(msgbus.DataType.TRADE, empty_callback))
+        subs.append(hub.subscribe(trade_type, empty_callback))
 
     # 创建 C++ 生产者（注意：需要传递 hub 的地址）
     # pybind11 会自动处理指针传递
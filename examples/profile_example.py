@@ -2,24 +2,61 @@
 性能分析示例
 
 使用 cProfile 分析性能瓶颈
+
+默认只对前 PROFILED_MESSAGES 条消息开启 cProfile, 其余消息不做插桩,
+使测得的吞吐量接近真实值; 传入 --detailed 则对全部消息做 profile
 """
 
 import msgbus
 import time
-import random
+import argparse
 import cProfile
 import pstats
 from io import StringIO
 
+import numpy as np
+
+
+# 默认模式下开启 cProfile 的消息数
+PROFILED_MESSAGES = 5000
+
 
 def simple_callback(data_type, data):
     """简单回调 - 只访问数据不做任何处理"""
-    _ = data['timestamp']
-    _ = data['symbol']
-    _ = data['price']
+    _ = data.timestamp
+    _ = data.symbol
+    _ = data.price
+
+
+def produce(hub, prices, quantities, makers, begin, end):
+    """发送下标在 [begin, end) 范围内的 trade
+
+    emit_trade 在 C++ 侧构造 Trade 并打时间戳, 每条消息只有一次 pybind11 调用
+    """
+    emit_trade = hub.emit_trade
+    for i in range(begin, end):
+        emit_trade("BTCUSDT", prices[i], quantities[i], makers[i])
+
+
+def report(profiler, limit=20):
+    """打印 profile 结果, 同一个 Stats 对象依次按 cumulative / tottime 排序输出"""
+    s = StringIO()
+    ps = pstats.Stats(profiler, stream=s)
+    ps.strip_dirs()
+
+    for key, title in (('cumulative', 'cumulative time'), ('tottime', 'total time')):
+        print("\n" + "=" * 60)
+        print(f"Top {limit} functions by {title}:")
+        print("=" * 60)
 
+        s.seek(0)
+        s.truncate()
+        ps.sort_stats(key)
+        ps.print_stats(limit)
+        print(s.getvalue())
 
-def main():
+
+def main(detailed=False):
     print("=" * 60)
     print("Performance Profiling - msgbus")
     print("=" * 60)
@@ -30,55 +67,37 @@ def main():
     print("\n[1] Testing with 1 subscriber...")
     sub1 = hub.subscribe(msgbus.DataType.TRADE, simple_callback)
 
-    profiler = cProfile.Profile()
-    profiler.enable()
-
-    start = time.time()
     num_messages = 100000
     base_price = 50000.0
 
-    for i in range(num_messages):
-        trade = msgbus.Trade()
-        trade.timestamp = time.time_ns()
-        trade.symbol = "BTCUSDT"
-        trade.price = base_price + random.uniform(-100, 100)
-        trade.quantity = random.uniform(0.01, 1.0)
-        trade.is_buyer_maker = random.choice([True, False])
-        hub.add_trade(trade)
+    # 预先批量生成随机数, 避免 random 调用污染 profile 结果
+    rng = np.random.default_rng()
+    prices = (base_price + rng.uniform(-100, 100, num_messages)).tolist()
+    quantities = rng.uniform(0.01, 1.0, num_messages).tolist()
+    makers = rng.integers(0, 2, num_messages, dtype=bool).tolist()
 
-    elapsed = time.time() - start
+    num_profiled = num_messages if detailed else min(PROFILED_MESSAGES, num_messages)
 
+    profiler = cProfile.Profile()
+
+    start = time.time()
+
+    profiler.enable()
+    produce(hub, prices, quantities, makers, 0, num_profiled)
     profiler.disable()
+    produce(hub, prices, quantities, makers, num_profiled, num_messages)
+
+    elapsed = time.time() - start
 
     # 等待消费完成
     time.sleep(1)
 
-    print(f"Messages sent: {num_messages}")
+    print(f"Messages sent: {num_messages} ({num_profiled} profiled)")
     print(f"Time elapsed: {elapsed:.2f}s")
     print(f"Throughput: {num_messages / elapsed:.0f} msgs/sec")
 
     # 打印性能分析结果
-    print("\n" + "=" * 60)
-    print("Top 20 functions by cumulative time:")
-    print("=" * 60)
-
-    s = StringIO()
-    ps = pstats.Stats(profiler, stream=s)
-    ps.strip_dirs()
-    ps.sort_stats('cumulative')
-    ps.print_stats(20)
-    print(s.getvalue())
-
-    print("\n" + "=" * 60)
-    print("Top 20 functions by total time:")
-    print("=" * 60)
-
-    s = StringIO()
-    ps = pstats.Stats(profiler, stream=s)
-    ps.strip_dirs()
-    ps.sort_stats('tottime')
-    ps.print_stats(20)
-    print(s.getvalue())
+    report(profiler)
 
     hub.stop_all()
 
@@ -88,61 +107,42 @@ def main():
     print("=" * 60)
 
     hub2 = msgbus.MarketDataHub()
-    sub1 = hub2.subscribe(msgbus.DataType.TRADE, simple_callback)
-    sub2 = hub2.subscribe(msgbus.DataType.TRADE, simple_callback)
-    sub3 = hub2.subscribe(msgbus.DataType.TRADE, simple_callback)
-    sub4 = hub2.subscribe(msgbus.DataType.TRADE, simple_callback)
+    trade_type = msgbus.DataType.TRADE
+    sub1 = hub2.subscribe(trade_type, simple_callback)
+    sub2 = hub2.subscribe(trade_type, simple_callback)
+    sub3 = hub2.subscribe(trade_type, simple_callback)
+    sub4 = hub2.subscribe(trade_type, simple_callback)
 
-    profiler2 = cProfile.Profile()
-    profiler2.enable()
+    # 复用同一个 profiler, 先清空上一轮的数据
+    profiler.clear()
 
     start = time.time()
 
-    for i in range(num_messages):
-        trade = msgbus.Trade()
-        trade.timestamp = time.time_ns()
-        trade.symbol = "BTCUSDT"
-        trade.price = base_price + random.uniform(-100, 100)
-        trade.quantity = random.uniform(0.01, 1.0)
-        trade.is_buyer_maker = random.choice([True, False])
-        hub2.add_trade(trade)
+    profiler.enable()
+    produce(hub2, prices, quantities, makers, 0, num_profiled)
+    profiler.disable()
+    produce(hub2, prices, quantities, makers, num_profiled, num_messages)
 
     elapsed = time.time() - start
 
-    profiler2.disable()
-
     # 等待消费完成
     time.sleep(2)
 
-    print(f"Messages sent: {num_messages}")
+    print(f"Messages sent: {num_messages} ({num_profiled} profiled)")
     print(f"Time elapsed: {elapsed:.2f}s")
     print(f"Throughput: {num_messages / elapsed:.0f} msgs/sec")
 
     # 打印性能分析结果
-    print("\n" + "=" * 60)
-    print("Top 20 functions by cumulative time:")
-    print("=" * 60)
-
-    s = StringIO()
-    ps = pstats.Stats(profiler2, stream=s)
-    ps.strip_dirs()
-    ps.sort_stats('cumulative')
-    ps.print_stats(20)
-    print(s.getvalue())
-
-    print("\n" + "=" * 60)
-    print("Top 20 functions by total time:")
-    print("=" * 60)
-
-    s = StringIO()
-    ps = pstats.Stats(profiler2, stream=s)
-    ps.strip_dirs()
-    ps.sort_stats('tottime')
-    ps.print_stats(20)
-    print(s.getvalue())
+    report(profiler)
 
     hub2.stop_all()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--detailed", action="store_true",
+                        help="profile every message instead of only the first "
+                             f"{PROFILED_MESSAGES} (slower, inflates timings)")
+    args = parser.parse_args()
+    main(detailed=args.detailed)
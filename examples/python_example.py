@@ -16,20 +16,20 @@ import random
 # 定义回调函数
 def kline_callback(data_type, data):
     """K线数据回调"""
-    print(f"[KLINE] {data['symbol']}: O={data['open']:.2f}, H={data['high']:.2f}, "
-          f"L={data['low']:.2f}, C={data['close']:.2f}, V={data['volume']:.2f}")
+    print(f"[KLINE] {data.symbol}: O={data.open:.2f}, H={data.high:.2f}, "
+          f"L={data.low:.2f}, C={data.close:.2f}, V={data.volume:.2f}")
 
 
 def trade_callback(data_type, data):
     """成交数据回调"""
-    side = "SELL" if data['is_buyer_maker'] else "BUY"
-    print(f"[TRADE] {data['symbol']}: {side} {data['quantity']:.4f} @ {data['price']:.2f}")
+    side = "SELL" if data.is_buyer_maker else "BUY"
+    print(f"[TRADE] {data.symbol}: {side} {data.quantity:.4f} @ {data.price:.2f}")
 
 
 def book_l1_callback(data_type, data):
     """L1行情回调"""
-    print(f"[BOOK] {data['symbol']}: Bid={data['bid_price']:.2f}x{data['bid_quantity']:.4f}, "
-          f"Ask={data['ask_price']:.2f}x{data['ask_quantity']:.4f}")
+    print(f"[BOOK] {data.symbol}: Bid={data.bid_price:.2f}x{data.bid_quantity:.4f}, "
+          f"Ask={data.ask_price:.2f}x{data.ask_quantity:.4f}")
 
 
 def main():
@@ -67,14 +67,9 @@ def main():
                 hub.add_kline(kline, True)
 
             elif i % 3 == 1:
-                # 添加 Trade 数据
-                trade = msgbus.Trade()
-                trade.timestamp = int(time.time() * 1e9)
-                trade.symbol = "BTCUSDT"
-                trade.price = price
-                trade.quantity = random.uniform(0.01, 1.0)
-                trade.is_buyer_maker = random.choice([True, False])
-                hub.add_trade(trade, True)
+                # 添加 Trade 数据 (emit_trade 在 C++ 侧构造 Trade 并打时间戳)
+                hub.emit_trade("BTCUSDT", price, random.uniform(0.01, 1.0),
+                               bool(random.getrandbits(1)), True)
 
             else:
                 # 添加 BookL1 数据
@@ -1,17 +1,27 @@
 """
 吞吐量测试 - 对比不同场景的性能
 
-测试场景：
+逐条生产 (Python 循环调用 add_trade, 与订阅者回调竞争 GIL)：
 1. 无回调（仅生产）
 2. 1个订阅者（空回调）
 3. 4个订阅者（空回调）
-4. 4个订阅者（带计算的回调）
+4. 1个订阅者（简单回调）
+5. 4个订阅者（简单回调）
+6. 4个订阅者（带计算的回调）
+
+批量生产 (add_trades_bulk, 整个数组一次调用, 期间释放 GIL)：
+7. 无回调
+8. 4个订阅者（简单回调, 队列被套圈, 统计每个订阅者实际收到的消息数）
+
+订阅者开销 / GIL 竞争分析只基于逐条生产的测试 1-3
 """
 
 import msgbus
 import time
 import gc
 
+import numpy as np
+
 
 # 空回调 - 什么都不做
 def empty_callback(data_type, data):
@@ -20,20 +30,46 @@ def empty_callback(data_type, data):
 
 # 简单回调 - 只访问字段
 def simple_callback(data_type, data):
-    _ = data['timestamp']
-    _ = data['price']
-    _ = data['symbol']
+    _ = data.timestamp
+    _ = data.price
+    _ = data.symbol
 
 
 # 复杂回调 - 带计算
-counter = {'count': 0, 'sum': 0.0}
+class Counter:
+    """回调计数器 (__slots__ 属性访问比 dict 下标访问更快)"""
+    __slots__ = ('count', 'sum')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.sum = 0.0
+
+
+counter = Counter()
 def complex_callback(data_type, data):
-    counter['count'] += 1
-    counter['sum'] += data['price']
+    counter.count += 1
+    counter.sum += data.price
 
 
-def benchmark(name, num_subscribers, callback_fn, num_messages=100000):
-    """运行单个 benchmark"""
+def counting(callback_fn, cell):
+    """包装回调, 把收到的消息数累加到 cell[0]"""
+    def callback(data_type, data):
+        cell[0] += 1
+        callback_fn(data_type, data)
+    return callback
+
+
+def benchmark(name, num_subscribers, callback_fn, num_messages=100000, bulk=False):
+    """运行单个 benchmark
+
+    bulk=False: 预先创建好全部 Trade 对象, 计时部分只有逐条 add_trade 调用
+    bulk=True:  预先填好 NumPy 结构化数组, 计时部分是一次 add_trades_bulk 调用
+                生产远快于消费, 512 槽的环形队列会被套圈, 订阅者跳过未读消息,
+                因此额外统计每个订阅者实际收到的消息数
+    """
     print(f"\n{'=' * 60}")
     print(f"{name}")
     print(f"{'=' * 60}")
@@ -43,33 +79,55 @@ def benchmark(name, num_subscribers, callback_fn, num_messages=100000):
 
     hub = msgbus.MarketDataHub()
 
-    # 创建订阅者
+    # 创建订阅者 (枚举值在循环外取一次)
+    trade_type = msgbus.DataType.TRADE
     subs = []
+    received = []
     for _ in range(num_subscribers):
         if callback_fn:
-            subs.append(hub.subscribe(msgbus.DataType.TRADE, callback_fn))
+            if bulk:
+                cell = [0]
+                received.append(cell)
+                subs.append(hub.subscribe(trade_type, counting(callback_fn, cell)))
+            else:
+                subs.append(hub.subscribe(trade_type, callback_fn))
 
     print(f"Subscribers: {num_subscribers}")
     print(f"Messages: {num_messages}")
 
-    # 预创建所有 trade 对象以避免创建开销
-    trades = []
-    for i in range(num_messages):
-        trade = msgbus.Trade()
-        trade.timestamp = i
-        trade.symbol = "BTCUSDT"
-        trade.price = 50000.0 + (i % 100)
-        trade.quantity = 1.0
-        trade.is_buyer_maker = False
-        trades.append(trade)
+    if bulk:
+        # 用 NumPy 结构化数组一次性构造所有 trade, 不为每条消息创建 Python 对象
+        trades = np.zeros(num_messages, dtype=msgbus.Trade.numpy_dtype())
+        trades['timestamp'] = np.arange(num_messages)
+        trades['price'] = 50000.0 + np.arange(num_messages) % 100
+        trades['quantity'] = 1.0
+        trades['symbol'] = b"BTCUSDT"
+
+        # 测量纯生产性能 (整块数组一次调用提交)
+        start = time.perf_counter()
+
+        hub.add_trades_bulk(trades)
+
+        produce_time = time.perf_counter() - start
+    else:
+        # 预创建所有 trade 对象以避免创建开销
+        trades = []
+        for i in range(num_messages):
+            trade = msgbus.Trade()
+            trade.timestamp = i
+            trade.symbol = "BTCUSDT"
+            trade.price = 50000.0 + (i % 100)
+            trade.quantity = 1.0
+            trade.is_buyer_maker = False
+            trades.append(trade)
 
-    # 测量纯生产性能
-    start = time.perf_counter()
+        # 测量纯生产性能 (逐条提交)
+        start = time.perf_counter()
 
-    for trade in trades:
-        hub.add_trade(trade)
+        for trade in trades:
+            hub.add_trade(trade)
 
-    produce_time = time.perf_counter() - start
+        produce_time = time.perf_counter() - start
 
     # 等待消费完成
     if num_subscribers > 0:
@@ -83,6 +141,10 @@ def benchmark(name, num_subscribers, callback_fn, num_messages=100000):
         print(f"Total time (with 2s wait): {total_time:.3f}s")
         print(f"Overall throughput: {num_messages / total_time:.0f} msgs/sec")
 
+    if received:
+        counts = ", ".join(str(cell[0]) for cell in received)
+        print(f"Received per subscriber: {counts} (of {num_messages})")
+
     hub.stop_all()
 
     gc.enable()
@@ -139,8 +201,7 @@ def main():
     )
 
     # 测试6: 4个订阅者，复杂回调
-    counter['count'] = 0
-    counter['sum'] = 0.0
+    counter.reset()
     t6 = benchmark(
         "Test 6: 4 subscribers with complex callback",
         num_subscribers=4,
@@ -148,9 +209,27 @@ def main():
         num_messages=num_messages
     )
 
+    # 测试7: 批量生产，无订阅者
+    t7 = benchmark(
+        "Test 7: Bulk ingestion (add_trades_bulk), no subscribers",
+        num_subscribers=0,
+        callback_fn=None,
+        num_messages=num_messages,
+        bulk=True
+    )
+
+    # 测试8: 批量生产，4个订阅者，简单回调
+    t8 = benchmark(
+        "Test 8: Bulk ingestion (add_trades_bulk), 4 subscribers with simple callback",
+        num_subscribers=4,
+        callback_fn=simple_callback,
+        num_messages=num_messages,
+        bulk=True
+    )
+
     # 汇总
     print("\n\n" + "=" * 60)
-    print("SUMMARY")
+    print("SUMMARY - per-message Python producer (add_trade)")
     print("=" * 60)
     print(f"Baseline (no subscribers):          {num_messages/t1:>10.0f} msgs/sec")
     print(f"1 subscriber (empty):               {num_messages/t2:>10.0f} msgs/sec  ({t2/t1:.2f}x)")
@@ -160,7 +239,15 @@ def main():
     print(f"4 subscribers (complex):            {num_messages/t6:>10.0f} msgs/sec  ({t6/t1:.2f}x)")
 
     print("\n" + "=" * 60)
-    print("OVERHEAD ANALYSIS")
+    print("SUMMARY - bulk ingestion (add_trades_bulk, GIL released)")
+    print("=" * 60)
+    print(f"No subscribers:                     {num_messages/t7:>10.0f} msgs/sec  ({t1/t7:.1f}x vs per-message)")
+    # 订阅者被套圈后跳过了大部分消息, 与逐条生产的测试 5 不可比, 见测试 8 的 Received 统计
+    print(f"4 subscribers (simple):             {num_messages/t8:>10.0f} msgs/sec  (most messages skipped, see Test 8)")
+
+    # 只有逐条生产时, 生产者才和订阅者回调竞争 GIL, 下面的分析才有意义
+    print("\n" + "=" * 60)
+    print("OVERHEAD ANALYSIS (per-message producer, tests 1-3)")
     print("=" * 60)
     overhead_1sub = ((t2 - t1) / t1) * 100
     overhead_4sub = ((t3 - t1) / t1) * 100
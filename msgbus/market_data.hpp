@@ -1,5 +1,6 @@
 #pragma once
 
+#include <chrono>
 #include <cstdint>
 #include <variant>
 #include <cstring>
@@ -61,4 +62,11 @@ enum class DataType {
     BOOK_L1 = 2
 };
 
+// 单调时钟纳秒时间戳
+// Linux 上 steady_clock 与 Python time.perf_counter_ns() 同为 CLOCK_MONOTONIC, 两侧时间戳可直接相减
+inline uint64_t now_ns() {
+    return static_cast<uint64_t>(std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::steady_clock::now().time_since_epoch()).count());
+}
+
 } // namespace marketdata
@@ -2,6 +2,7 @@
 
 #include "spmc.hpp"
 #include "market_data.hpp"
+#include <algorithm>
 #include <functional>
 #include <memory>
 #include <mutex>
@@ -95,32 +96,37 @@ public:
      * @param subscriber_id 订阅ID
      */
     void unsubscribe(int subscriber_id) {
-        std::lock_guard<std::mutex> lock(mutex_);
+        std::unique_ptr<Subscriber> subscriber;
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
 
-        auto it = subscribers_.find(subscriber_id);
-        if (it != subscribers_.end()) {
-            // 停止线程
-            it->second->running = false;
-            if (it->second->thread && it->second->thread->joinable()) {
-                it->second->thread->join();
+            auto it = subscribers_.find(subscriber_id);
+            if (it == subscribers_.end()) {
+                return;
             }
+            subscriber = std::move(it->second);
             subscribers_.erase(it);
         }
+
+        // 在锁外停止线程并销毁订阅者: 回调线程和 callback 的析构都要获取 GIL,
+        // 持有 mutex_ 时等待 GIL 会与 "持有 GIL 再取 mutex_" 的调用方死锁
+        stop_subscriber(*subscriber);
     }
 
     /**
      * 停止所有订阅
      */
     void stop_all() {
-        std::lock_guard<std::mutex> lock(mutex_);
+        std::unordered_map<int, std::unique_ptr<Subscriber>> subscribers;
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            subscribers.swap(subscribers_);
+        }
 
-        for (auto& [id, subscriber] : subscribers_) {
-            subscriber->running = false;
-            if (subscriber->thread && subscriber->thread->joinable()) {
-                subscriber->thread->join();
-            }
+        // 同 unsubscribe, 在锁外 join 线程, 订阅者在函数返回时销毁
+        for (auto& [id, subscriber] : subscribers) {
+            stop_subscriber(*subscriber);
         }
-        subscribers_.clear();
     }
 
     /**
@@ -132,6 +138,16 @@ public:
     }
 
 private:
+    /**
+     * 停止订阅者的后台线程 (调用方不能持有 mutex_)
+     */
+    static void stop_subscriber(Subscriber& subscriber) {
+        subscriber.running = false;
+        if (subscriber.thread && subscriber.thread->joinable()) {
+            subscriber.thread->join();
+        }
+    }
+
     /**
      * 消费者线程函数
      * @param subscriber_id 订阅者ID
@@ -240,14 +256,37 @@ public:
     }
 
 private:
+    // 每生产 CLOCK_INTERVAL 条消息读一次时钟
+    static constexpr uint64_t CLOCK_INTERVAL = 1024;
+
     void producer_thread() {
         messages_produced_ = 0;
 
+        // 时间戳为近似值: 每 CLOCK_INTERVAL 条消息读一次单调时钟 (与 time.perf_counter_ns() 同源),
+        // 窗口内按已实测到的最小每条消息耗时 (tick) 做线性插值
+        // 取最小值而不是上一窗口的值: 插值宁可落后于真实时钟 (下次读时钟时被校正), 也不要超前
+        // 第一个窗口还没有实测 tick, 其中的消息共用同一个时间戳
+        uint64_t last_read = now_ns();
+        uint64_t window_clock = last_read;
+        double tick = 0.0;
+        uint64_t timestamp = window_clock;
+
         for (uint64_t i = 0; i < num_messages_ && running_; ++i) {
+            const uint64_t offset = i % CLOCK_INTERVAL;
+            if (offset == 0 && i != 0) {
+                const uint64_t now = now_ns();
+                const double measured = static_cast<double>(now - last_read) / CLOCK_INTERVAL;
+                tick = (tick == 0.0) ? measured : std::min(tick, measured);
+                last_read = now;
+                // 本窗口若比之前都快, 插值仍可能略微超前; 取较大值保证时间戳不回退
+                window_clock = std::max(now, timestamp);
+            }
+            timestamp = window_clock + static_cast<uint64_t>(offset * tick);
+
             if (message_type_ == 0) {
                 // 生成 Trade
                 Trade trade;
-                trade.timestamp = i;
+                trade.timestamp = timestamp;
                 trade.price = 50000.0 + (i % 100);
                 trade.quantity = 1.0;
                 trade.is_buyer_maker = (i % 2 == 0);
@@ -258,7 +297,7 @@ private:
             } else if (message_type_ == 1) {
                 // 生成 Kline
                 Kline kline;
-                kline.timestamp = i;
+                kline.timestamp = timestamp;
                 kline.open = 50000.0;
                 kline.high = 50100.0;
                 kline.low = 49900.0;
@@ -271,7 +310,7 @@ private:
             } else {
                 // 生成 BookL1
                 BookL1 book;
-                book.timestamp = i;
+                book.timestamp = timestamp;
                 book.bid_price = 50000.0;
                 book.bid_quantity = 10.0;
                 book.ask_price = 50001.0;
@@ -1,5 +1,6 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/functional.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 #include "market_data.hpp"
 #include "market_data_hub.hpp"
@@ -13,49 +14,32 @@ class PyCallbackWrapper {
 public:
     PyCallbackWrapper(py::object callback) : callback_(callback) {}
 
+    ~PyCallbackWrapper() {
+        // stop_all/unsubscribe 在释放 GIL 的状态下销毁订阅者, 释放 Python 对象前需重新获取 GIL
+        py::gil_scoped_acquire acquire;
+        callback_ = py::object();
+    }
+
     void operator()(DataType data_type, const void* data_ptr) {
         // 获取 GIL (因为要调用Python代码)
         py::gil_scoped_acquire acquire;
 
         try {
+            // 直接把 C++ 结构体的拷贝交给回调, Python 侧通过属性访问字段 (data.price),
+            // 省去每条消息构造 dict 和字符串 key 的开销
             switch (data_type) {
-                case DataType::KLINE: {
-                    const Kline* kline = static_cast<const Kline*>(data_ptr);
-                    // 创建Python对象并传递给回调
-                    py::dict result;
-                    result["timestamp"] = kline->timestamp;
-                    result["open"] = kline->open;
-                    result["high"] = kline->high;
-                    result["low"] = kline->low;
-                    result["close"] = kline->close;
-                    result["volume"] = kline->volume;
-                    result["symbol"] = std::string(kline->symbol, strnlen(kline->symbol, sizeof(kline->symbol)));
-                    callback_("kline", result);
+                case DataType::KLINE:
+                    callback_("kline", py::cast(*static_cast<const Kline*>(data_ptr),
+                                                py::return_value_policy::copy));
                     break;
-                }
-                case DataType::TRADE: {
-                    const Trade* trade = static_cast<const Trade*>(data_ptr);
-                    py::dict result;
-                    result["timestamp"] = trade->timestamp;
-                    result["price"] = trade->price;
-                    result["quantity"] = trade->quantity;
-                    result["symbol"] = std::string(trade->symbol, strnlen(trade->symbol, sizeof(trade->symbol)));
-                    result["is_buyer_maker"] = trade->is_buyer_maker;
-                    callback_("trade", result);
+                case DataType::TRADE:
+                    callback_("trade", py::cast(*static_cast<const Trade*>(data_ptr),
+                                                py::return_value_policy::copy));
                     break;
-                }
-                case DataType::BOOK_L1: {
-                    const BookL1* book = static_cast<const BookL1*>(data_ptr);
-                    py::dict result;
-                    result["timestamp"] = book->timestamp;
-                    result["bid_price"] = book->bid_price;
-                    result["bid_quantity"] = book->bid_quantity;
-                    result["ask_price"] = book->ask_price;
-                    result["ask_quantity"] = book->ask_quantity;
-                    result["symbol"] = std::string(book->symbol, strnlen(book->symbol, sizeof(book->symbol)));
-                    callback_("book_l1", result);
+                case DataType::BOOK_L1:
+                    callback_("book_l1", py::cast(*static_cast<const BookL1*>(data_ptr),
+                                                  py::return_value_policy::copy));
                     break;
-                }
             }
         } catch (const std::exception& e) {
             // 捕获异常避免C++线程崩溃
@@ -67,6 +51,16 @@ private:
     py::object callback_;
 };
 
+// 注册 Trade 对应的 NumPy 结构化 dtype
+// 延迟到第一次使用时才注册, 这样 import msgbus 不会强制依赖 numpy (调用时需持有 GIL)
+static void register_trade_dtype() {
+    static bool registered = false;
+    if (!registered) {
+        PYBIND11_NUMPY_DTYPE(Trade, timestamp, price, quantity, symbol, is_buyer_maker);
+        registered = true;
+    }
+}
+
 PYBIND11_MODULE(_core, m) {
     m.doc() = "msgbus C++ core module - High performance SPMC market data distribution";
 
@@ -101,11 +95,16 @@ PYBIND11_MODULE(_core, m) {
         .def_readwrite("quantity", &Trade::quantity)
         .def_readwrite("is_buyer_maker", &Trade::is_buyer_maker)
         .def_property("symbol",
-            [](const Trade& t) { return std::string(t.symbol); },
+            // 经 add_trades_bulk 写入的 symbol 可能占满 32 字节而没有 '\0'
+            [](const Trade& t) { return std::string(t.symbol, strnlen(t.symbol, sizeof(t.symbol))); },
             [](Trade& t, const std::string& s) {
                 strncpy(t.symbol, s.c_str(), sizeof(t.symbol) - 1);
                 t.symbol[sizeof(t.symbol) - 1] = '\0';
-            });
+            })
+        .def_static("numpy_dtype", []() {
+            register_trade_dtype();
+            return py::dtype::of<Trade>();
+        }, "NumPy structured dtype matching the C++ Trade layout (for add_trades_bulk)");
 
     // 绑定 BookL1 结构体
     py::class_<BookL1>(m, "BookL1")
@@ -145,6 +144,28 @@ PYBIND11_MODULE(_core, m) {
         }, py::arg("trade"), py::arg("release_gil") = false,
            "Add Trade data to the hub\n"
            "Note: `release_gil=True` can reduce GIL blocking for consumer callbacks, but adds overhead per call.")
+        .def("emit_trade", [](MarketDataHub& hub, const std::string& symbol, double price,
+                              double quantity, bool is_buyer_maker, bool release_gil) {
+            // 一次调用完成 构造 + 打时间戳 + 发布, 不经过 Python 侧的 Trade 对象和逐字段 setter
+            Trade trade;
+            strncpy(trade.symbol, symbol.c_str(), sizeof(trade.symbol) - 1);
+            trade.symbol[sizeof(trade.symbol) - 1] = '\0';
+            trade.price = price;
+            trade.quantity = quantity;
+            trade.is_buyer_maker = is_buyer_maker;
+            if (release_gil) {
+                py::gil_scoped_release release;
+                trade.timestamp = now_ns();
+                hub.add(MarketData(trade));
+            } else {
+                trade.timestamp = now_ns();
+                hub.add(MarketData(trade));
+            }
+        }, py::arg("symbol"), py::arg("price"), py::arg("quantity"),
+           py::arg("is_buyer_maker") = false, py::arg("release_gil") = false,
+           "Build a Trade, stamp it with the monotonic clock (same source as time.perf_counter_ns() on Linux) "
+           "and add it to the hub in a single call\n"
+           "Note: `release_gil=True` can reduce GIL blocking for consumer callbacks, but adds overhead per call.")
         .def("add_book_l1", [](MarketDataHub& hub, const BookL1& book, bool release_gil) {
             if (release_gil) {
                 py::gil_scoped_release release;
@@ -169,6 +190,24 @@ PYBIND11_MODULE(_core, m) {
             }
         }, py::arg("trades"),
            "Add a batch of Trade messages (releases the GIL once for the whole batch).")
+        .def("add_trades_bulk", [](MarketDataHub& hub, py::array trades) {
+            register_trade_dtype();
+            auto rows = py::array_t<Trade, py::array::c_style>::ensure(trades);
+            if (!rows) {
+                throw py::type_error("trades must be a NumPy array with dtype Trade.numpy_dtype()");
+            }
+
+            // 直接读取数组的连续内存, 不为每一行创建 Python 对象
+            const Trade* data = rows.data();
+            const py::ssize_t n = rows.size();
+
+            py::gil_scoped_release release;
+            for (py::ssize_t i = 0; i < n; ++i) {
+                hub.add(MarketData(data[i]));
+            }
+        }, py::arg("trades"),
+           "Add Trade messages from a NumPy structured array with dtype Trade.numpy_dtype()\n"
+           "Rows are copied straight from the array buffer; the GIL is released for the whole batch.")
         .def("add_books_l1", [](MarketDataHub& hub, const std::vector<BookL1>& books) {
             py::gil_scoped_release release;
             for (const auto& book : books) {
@@ -188,7 +227,7 @@ PYBIND11_MODULE(_core, m) {
             return hub.subscribe(data_type, std::move(cpp_callback));
         }, py::arg("data_type"), py::arg("callback"),
            "Subscribe to market data with a callback function\n"
-           "Callback signature: callback(data_type: str, data: dict)")
+           "Callback signature: callback(data_type: str, data: Kline | Trade | BookL1)")
         .def("unsubscribe", [](MarketDataHub& hub, int subscriber_id) {
             py::gil_scoped_release release;
             hub.unsubscribe(subscriber_id);
@@ -198,6 +237,7 @@ PYBIND11_MODULE(_core, m) {
             hub.stop_all();
         }, "Stop all subscriptions")
         .def("subscriber_count", &MarketDataHub::subscriber_count,
+             py::call_guard<py::gil_scoped_release>(),
              "Get current subscriber count");
 
     // 绑定 MockCppProducer
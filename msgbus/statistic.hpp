@@ -31,8 +31,21 @@ public:
         }
 
         T first = vec[0];
-        std::sort(vec.begin(), vec.end());
-        
+        auto min_max = std::minmax_element(vec.begin(), vec.end());
+        T min_v = *min_max.first;
+        T max_v = *min_max.second;
+
+        // 分位点下标只计算一次, 按从小到大依次 nth_element:
+        // 每次只在上一个分位点之后的区间内选择, 无需 O(N log N) 的完整排序
+        const size_t ranks[] = {n / 100, n / 10, n / 2, n * 9 / 10, n * 99 / 100};
+        size_t lo = 0;
+        for (size_t r : ranks) {
+            if (r >= lo) {  // 与上一个分位点下标相同时该位置已就位
+                std::nth_element(vec.begin() + lo, vec.begin() + r, vec.end());
+                lo = r + 1;
+            }
+        }
+
         T sum = std::accumulate(vec.begin(), vec.end(), T(0));
         T mean = sum / n;
         
@@ -42,16 +55,16 @@ public:
         }
         var /= n;
 
-        os << "min: " << vec.front() << std::endl;
-        os << "max: " << vec.back() << std::endl;
+        os << "min: " << min_v << std::endl;
+        os << "max: " << max_v << std::endl;
         os << "first: " << first << std::endl;
         os << "mean: " << mean << std::endl;
         os << "sd: " << sqrt(static_cast<double>(var)) << std::endl;
-        os << "1%: " << vec[n * 1 / 100] << std::endl;
-        os << "10%: " << vec[n * 10 / 100] << std::endl;
-        os << "50%: " << vec[n * 50 / 100] << std::endl;
-        os << "90%: " << vec[n * 90 / 100] << std::endl;
-        os << "99%: " << vec[n * 99 / 100] << std::endl;
+        os << "1%: " << vec[ranks[0]] << std::endl;
+        os << "10%: " << vec[ranks[1]] << std::endl;
+        os << "50%: " << vec[ranks[2]] << std::endl;
+        os << "90%: " << vec[ranks[3]] << std::endl;
+        os << "99%: " << vec[ranks[4]] << std::endl;
     }
 
 private: